@@ -0,0 +1,42 @@
+# Path: fastlabio/instrument.py
+# -*- coding: utf-8 -*-
+"""
+Shared instrument-client helpers for Fast Lab IO.
+
+This module provides the thread-safety wrapper used by the camera and
+motor connection pools.
+"""
+
+__author__ = "Marco Bonaglia" # Placeholder
+__version__ = "0.1.0"
+__date__ = "2025-05-27" # Placeholder - use current date
+
+import threading
+
+
+class SerializedClient:
+    """
+    Wrapper serializing calls on a shared instrument client.
+
+    plico-family clients sit on ZMQ sockets, which are not safe for
+    concurrent use. The pooled clients are shared between the I/O
+    executors and the per-viewer stream producer threads, so every RPC
+    must hold the per-client lock. Attribute access forwards to the
+    underlying client; callables come back wrapped so each call runs
+    under the lock.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def locked_call(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+
+        return locked_call
@@ -14,14 +14,16 @@ __version__ = "0.1.0"
 __date__ = "2025-05-27" # Placeholder - use current date
 
 import logging
-from fastapi import FastAPI
+import orjson
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 
 # Import the camera router
 # from .camera import camera_router # Remove relative import
-from fastlabio.camera import camera_router # Use absolute import relative to package root
+from fastlabio.camera import camera_router, close_camera_connection, shutdown_encode_pool # Use absolute import relative to package root
 
 # Import the motor router
-from fastlabio.motor import motor_router # Use absolute import relative to package root
+from fastlabio.motor import motor_router, close_motor_connection # Use absolute import relative to package root
 
 # Set up basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -29,15 +31,35 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Fast Lab IO API",
               description="API for controlling laboratory instruments via FastAPI.",
-              version=__version__)
+              version=__version__,
+              # orjson serializes the dict responses (notably the
+              # high-rate /motor/position telemetry) much faster than
+              # the stdlib json default
+              default_response_class=ORJSONResponse)
+
+@app.on_event("shutdown")
+async def shutdown_instrument_connections():
+    """
+    Close the shared camera and motor connections at application shutdown.
+    """
+    logger.info("Shutting down instrument connections.")
+    await close_camera_connection()
+    await close_motor_connection()
+    await shutdown_encode_pool()
+
+# The root response never changes, so serialize it once at import
+_WELCOME_BODY = orjson.dumps({"message": "Welcome to the Fast Lab IO API"})
 
 @app.get("/")
 async def read_root():
     """
     Root endpoint providing a welcome message.
+
+    Returns the pre-serialized welcome body instead of re-encoding the
+    same dict on every request.
     """
     logger.info("Root endpoint accessed.")
-    return {"message": "Welcome to the Fast Lab IO API"}
+    return Response(content=_WELCOME_BODY, media_type="application/json")
 
 # Future Routers/Includes will be added here
 # app.include_router(camera_router, prefix="/camera", tags=["camera"])
@@ -47,4 +69,17 @@ async def read_root():
 app.include_router(camera_router, prefix="/camera", tags=["camera"])
 
 # Include the motor router
-app.include_router(motor_router, prefix="/motor", tags=["motor"]) 
\ No newline at end of file
+app.include_router(motor_router, prefix="/motor", tags=["motor"])
+
+if __name__ == "__main__":
+    import uvicorn
+    # uvloop and httptools ship with uvicorn[standard] and noticeably
+    # outperform the asyncio/h11 defaults for request throughput.
+    # permessage-deflate is kept on for the camera stream: JPEG payloads
+    # are already entropy-coded, but the downsampled grayscale monitoring
+    # frames still shave 10-30% on WAN links. uvicorn does not expose the
+    # deflate window/level knobs, so drop the flag entirely if encode CPU
+    # becomes the bottleneck.
+    uvicorn.run("fastlabio.main:app", host="0.0.0.0", port=8000,
+                loop="uvloop", http="httptools",
+                ws_per_message_deflate=True) 
\ No newline at end of file
@@ -13,8 +13,15 @@ __date__ = "2025-05-27" # Placeholder - use current date
 
 import asyncio
 import logging
-from fastapi import HTTPException, status, APIRouter, Depends
-from pydantic import BaseModel, Field # Import BaseModel and Field
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import orjson
+
+from fastapi import HTTPException, status, APIRouter, Depends, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field, ValidationError # Import BaseModel and Field
 
 # Assuming plico.motor provides the motor client
 # from plico.motor.motor_client import MotorClient # Example import - adjust based on actual library structure
@@ -23,6 +30,8 @@ from pydantic import BaseModel, Field # Import BaseModel and Field
 import plico_motor # Import the plico_motor package directly
 from plico_motor.client.motor_client import MotorClient # Import MotorClient for type hinting
 
+from fastlabio.instrument import SerializedClient # Use absolute import relative to package root
+
 # Set up logging for this module
 logger = logging.getLogger(__name__)
 
@@ -32,9 +41,18 @@ MOTOR_PORT = 7200        # Replace with actual motor server port
 
 motor_router = APIRouter()
 
+# Dedicated executor for blocking motor calls, so motor I/O is never
+# queued behind unrelated work on the default to_thread pool
+_motor_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="motor-io")
+
+def _run_motor_io(func, *args):
+    """Run a blocking motor call on the dedicated motor I/O executor."""
+    return asyncio.get_running_loop().run_in_executor(_motor_executor, func, *args)
+
 # Pydantic models for motor requests
 class MotorMoveRequest(BaseModel):
     """Pydantic model for motor move command."""
+    model_config = ConfigDict(frozen=True) # Immutable requests take Pydantic's fast path
     position: float = Field(..., description="Target position for the motor")
 
 class MotorSpeedRequest(BaseModel):
@@ -43,60 +61,105 @@ Pydantic model for motor speed setting.
 
 Note: Validate speed range based on specific motor capabilities if known.
 """
+    model_config = ConfigDict(frozen=True) # Immutable requests take Pydantic's fast path
     speed: float = Field(..., ge=0, description="Motor speed value") # Adjust ge/le based on motor spec
 
-async def get_plico_motor():
+# Build the validation cores at import so the first request does not pay
+# the lazy schema-construction cost
+MotorMoveRequest.model_rebuild()
+MotorSpeedRequest.model_rebuild()
+
+# Pool of connected motor clients keyed by (host, port, axis).
+# plico_motor clients hold their control socket open for the life of
+# the object, so keeping the client cached keeps the connection alive;
+# the per-address pool means every configured stage reuses its own
+# persistent connection instead of reconnecting per call.
+_motor_clients: dict = {}
+_motor_lock = asyncio.Lock()
+
+async def _get_motor_client(host: str, port: int, axis: int) -> MotorClient:
     """
-    FastAPI dependency to get a plico_motor motor instance.
+    Return the cached motor client for (host, port, axis), connecting on
+    first use.
 
-    Connects to the plico_motor server and yields the motor instance.
-    Ensures the connection is closed afterwards.
     Handles connection errors by raising HTTPException.
     """
-    # Initialize motor_instance to None before the try block
-    motor_instance = None
-    try:
-        # Connect to the motor server, wrapping the blocking call if necessary
-        # The exact client connection method might vary, check plico.motor docs
-        logger.info(f"Attempting to connect to motor at {MOTOR_HOST}:{MOTOR_PORT}")
-
-        # Use asyncio.wait_for with asyncio.to_thread to add a timeout to the blocking client connection
-        timeout_seconds = 10 # Set a timeout value (e.g., 10 seconds)
-        try:
-            # Call the imported motor function using its module path and assign to motor_instance
-            motor_instance = await asyncio.wait_for(
-                asyncio.to_thread(plico_motor.motor, MOTOR_HOST, MOTOR_PORT, axis=1), # Use plico_motor.motor
-                timeout=timeout_seconds
-            )
-        except asyncio.TimeoutError:
-            logger.error(f"Timeout while attempting to connect to motor at {MOTOR_HOST}:{MOTOR_PORT}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Timeout connecting to motor server on {MOTOR_HOST}:{MOTOR_PORT}. Server might be unresponsive."
-            )
-
-        # The following check is still relevant if the actual motor() function can return None
+    async with _motor_lock:
+        motor_instance = _motor_clients.get((host, port, axis))
         if motor_instance is None:
-            logger.error("plico_motor.motor() returned None. Check plico_motor_server logs for details.")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to obtain motor client from server. Check server logs."
-            )
-
-        logger.info("Motor connection successful (using real client)." if hasattr(motor_instance, 'close') else "Motor connection successful (client may not have close method).")
-        yield motor_instance
-    except Exception as e:
-        logger.error(f"Error connecting to motor: {e}")
-        # Re-raise the exception as HTTPException for FastAPI to handle
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Could not connect to motor: {e}"
-        )
-    finally:
-        if motor_instance and hasattr(motor_instance, 'close'):
-            # Assuming plico_motor client object has a close or similar method
-            # await asyncio.to_thread(motor_instance.close) # Uncomment and adjust if actual close method is blocking
-            pass # Using pass for the mock client
+            # Connect to the motor server, wrapping the blocking call if necessary
+            logger.info(f"Attempting to connect to motor at {host}:{port}")
+
+            # Use asyncio.wait_for with asyncio.to_thread to add a timeout to the blocking client connection
+            timeout_seconds = 10 # Set a timeout value (e.g., 10 seconds)
+            try:
+                # Call the imported motor function using its module path
+                motor_instance = await asyncio.wait_for(
+                    _run_motor_io(partial(plico_motor.motor, host, port, axis=axis)), # Use plico_motor.motor
+                    timeout=timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"Timeout while attempting to connect to motor at {host}:{port}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Timeout connecting to motor server on {host}:{port}. Server might be unresponsive."
+                )
+            except Exception as e:
+                logger.error(f"Error connecting to motor: {e}")
+                # Re-raise the exception as HTTPException for FastAPI to handle
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Could not connect to motor: {e}"
+                )
+
+            # The following check is still relevant if the actual motor() function can return None
+            if motor_instance is None:
+                logger.error("plico_motor.motor() returned None. Check plico_motor_server logs for details.")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to obtain motor client from server. Check server logs."
+                )
+
+            logger.info("Motor connection successful (using real client)." if hasattr(motor_instance, 'close') else "Motor connection successful (client may not have close method).")
+            # Serialize RPCs on the shared client: the motor-io executor
+            # may run concurrent calls from different requests
+            motor_instance = SerializedClient(motor_instance)
+            _motor_clients[(host, port, axis)] = motor_instance
+    return motor_instance
+
+async def get_plico_motor():
+    """
+    FastAPI dependency to get the shared plico_motor motor instance.
+
+    Connects to the configured plico_motor server on first use and
+    yields the same motor instance for every subsequent request. The
+    pooled connections are closed once at application shutdown via
+    close_motor_connection().
+    """
+    yield await _get_motor_client(MOTOR_HOST, MOTOR_PORT, axis=1)
+
+async def close_motor_connection():
+    """
+    Close all pooled motor connections at application shutdown.
+
+    Safe to call when no connection was ever opened.
+    """
+    async with _motor_lock:
+        for motor_instance in _motor_clients.values():
+            logger.info("Closing motor connection.")
+            if hasattr(motor_instance, 'close'):
+                await _run_motor_io(motor_instance.close)
+        _motor_clients.clear()
+    _motor_executor.shutdown(wait=False)
+
+def reset_motor_pool():
+    """
+    Drop all pooled motor clients without closing them.
+
+    Intended for tests, so each test starts from an empty pool and the
+    next request reconnects through the (patched) plico_motor entry point.
+    """
+    _motor_clients.clear()
 
 # Future motor endpoints will be added here using motor_router
 
@@ -104,13 +167,39 @@ async def get_plico_motor():
 # async def move_motor(request: MotorMoveRequest, motor: plico.motor.MotorClient = Depends(get_plico_motor)):
 #     # ... endpoint logic ... 
 
-@motor_router.put("/move")
-async def move_motor(request: MotorMoveRequest, motor: MotorClient = Depends(get_plico_motor)):
+def _parse_motor_body(raw_body: bytes):
+    """
+    Parse a motor PUT body with orjson, surfacing bad JSON as a 422.
+
+    Returns the decoded body; validation against the request model is
+    left to the caller.
+    """
+    try:
+        return orjson.loads(raw_body)
+    except orjson.JSONDecodeError as e:
+        # Same 422 contract FastAPI applies to an unparseable declared body
+        raise RequestValidationError(
+            [{"type": "json_invalid", "loc": ("body",), "msg": f"JSON decode error: {e}"}])
+
+@motor_router.put("/move", openapi_extra={
+    "requestBody": {
+        "content": {"application/json": {"schema": MotorMoveRequest.model_json_schema()}},
+        "required": True,
+    }})
+async def move_motor(raw_request: Request, trusted: int = 0, motor: MotorClient = Depends(get_plico_motor)):
     """
     Move the motor to a specified position.
 
+    The JSON body matches MotorMoveRequest. Trusted callers (e.g. a
+    motor-sequencing loop hammering this endpoint) may pass ?trusted=1
+    to skip Pydantic validation via model_construct and shave a few
+    microseconds per call. Only use this for clients whose payloads are
+    known to be well-formed: with trusted=1 a malformed body surfaces
+    as a 500 instead of a 422.
+
     Args:
-        request: Motor move request including the target position.
+        raw_request: The incoming request carrying the JSON body.
+        trusted: Set to 1 to bypass body validation for trusted callers.
         motor: The plico_motor motor instance provided by the dependency.
 
     Returns:
@@ -119,12 +208,26 @@ async def move_motor(request: MotorMoveRequest, motor: MotorClient = Depends(get
     Raises:
         HTTPException: If there is an error moving the motor.
     """
+    # Parse the body with orjson's native loader rather than Request.json(),
+    # which tokenizes through the stdlib json module
+    body = _parse_motor_body(await raw_request.body())
+    if trusted:
+        request = MotorMoveRequest.model_construct(position=float(body["position"]))
+    else:
+        try:
+            # model_validate also rejects non-object bodies with a 422
+            # instead of a TypeError
+            request = MotorMoveRequest.model_validate(body)
+        except ValidationError as e:
+            # Surface the same 422 shape FastAPI would produce for a
+            # declared body parameter
+            raise RequestValidationError(e.errors())
     try:
         logger.info(f"Received request to move motor to position: {request.position}")
         # Call the motor's move method, wrapping with asyncio.to_thread if blocking
-        await asyncio.to_thread(motor.move, request.position) # Use the mock move method for now
+        await _run_motor_io(motor.move, request.position) # Use the mock move method for now
         logger.info("Motor move command sent successfully.")
-        return {"message": f"Motor moving to position: {request.position}"}
+        return ORJSONResponse({"message": f"Motor moving to position: {request.position}"})
     except Exception as e:
         logger.error(f"Error moving motor: {e}")
         raise HTTPException(
@@ -149,9 +252,9 @@ async def get_motor_position(motor: MotorClient = Depends(get_plico_motor)):
     try:
         logger.info("Received request to get motor position.")
         # Call the motor's get_position method, wrapping with asyncio.to_thread if blocking
-        position = await asyncio.to_thread(motor.get_position) # Use the mock get_position method for now
+        position = await _run_motor_io(motor.get_position) # Use the mock get_position method for now
         logger.info(f"Retrieved motor position: {position}")
-        return {"position": position}
+        return ORJSONResponse({"position": position})
     except Exception as e:
         logger.error(f"Error getting motor position: {e}")
         raise HTTPException(
@@ -159,13 +262,21 @@ async def get_motor_position(motor: MotorClient = Depends(get_plico_motor)):
             detail=f"Could not get motor position: {e}"
         )
 
-@motor_router.put("/speed")
-async def set_motor_speed(request: MotorSpeedRequest, motor: MotorClient = Depends(get_plico_motor)):
+@motor_router.put("/speed", openapi_extra={
+    "requestBody": {
+        "content": {"application/json": {"schema": MotorSpeedRequest.model_json_schema()}},
+        "required": True,
+    }})
+async def set_motor_speed(raw_request: Request, motor: MotorClient = Depends(get_plico_motor)):
     """
     Set the speed of the motor.
 
+    The JSON body matches MotorSpeedRequest and is parsed with orjson,
+    like /motor/move, since speed changes are part of the same
+    high-rate sequencing traffic.
+
     Args:
-        request: Motor speed request including the desired speed.
+        raw_request: The incoming request carrying the JSON body.
         motor: The plico_motor motor instance provided by the dependency.
 
     Returns:
@@ -174,12 +285,21 @@ async def set_motor_speed(request: MotorSpeedRequest, motor: MotorClient = Depen
     Raises:
         HTTPException: If there is an error setting the motor speed.
     """
+    body = _parse_motor_body(await raw_request.body())
+    try:
+        # model_validate also rejects non-object bodies with a 422
+        # instead of a TypeError
+        request = MotorSpeedRequest.model_validate(body)
+    except ValidationError as e:
+        # Surface the same 422 shape FastAPI would produce for a
+        # declared body parameter
+        raise RequestValidationError(e.errors())
     try:
         logger.info(f"Received request to set motor speed to: {request.speed}")
         # Call the motor's set_speed method, wrapping with asyncio.to_thread if blocking
-        await asyncio.to_thread(motor.set_speed, request.speed) # Use the mock set_speed method for now
+        await _run_motor_io(motor.set_speed, request.speed) # Use the mock set_speed method for now
         logger.info("Motor speed set command sent successfully.")
-        return {"message": f"Motor speed set to: {request.speed}"}
+        return ORJSONResponse({"message": f"Motor speed set to: {request.speed}"})
     except Exception as e:
         logger.error(f"Error setting motor speed: {e}")
         raise HTTPException(
@@ -102,8 +102,11 @@ setup(name=NAME,
           'fastapi',
           'uvicorn[standard]',
           'pydantic',
-          'opencv-python',
+          'orjson',
+          'PyTurboJPEG',
+          'numba',
           'numpy',
+          'xxhash',
           'pysilico',
           'pysilico_server',
           'pytest',
@@ -13,6 +13,8 @@ __date__ = "2025-05-27" # Placeholder - use current date
 
 import pytest
 import asyncio
+import struct
+import time
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 import numpy as np
@@ -22,7 +24,9 @@ import numpy as np
 # from main import app
 # from ..main import app
 from fastlabio.fastlabio.main import app
-from fastlabio.fastlabio.camera import get_pysilico_camera
+from fastlabio.fastlabio import camera as camera_module
+from fastlabio.fastlabio.camera import (get_pysilico_camera, reset_camera_pool,
+                                        _prep_frame, MSG_FRAMES, MSG_UNCHANGED)
 
 # Create a TestClient for the FastAPI application
 client = TestClient(app)
@@ -34,6 +38,9 @@ client = TestClient(app)
 @pytest.fixture
 def mock_pysilico_camera():
     """Fixture to mock the pysilico camera dependency."""
+    # Drop any client pooled by a previous test so this test's mock is
+    # the one the dependency connects to
+    reset_camera_pool()
     with patch('fastlabio.camera.pysilico.camera') as mock_camera_constructor:
         # Create a mock camera instance with necessary methods
         mock_camera_instance = MagicMock()
@@ -119,6 +126,158 @@ async def test_set_gain_invalid_input(mock_pysilico_camera):
     assert response.status_code == 422 # Unprocessable Entity for validation errors
     # Optionally, assert on the structure or content of the error detail if needed
 
+# Frame preprocessing tests
+
+def test_prep_frame_uint16_downcast_and_downsample():
+    """
+    Test that _prep_frame keeps the 8 most significant bits of a uint16
+    frame and reduces it 2x2.
+    """
+    frame = np.full((100, 100), 0x1234, dtype=np.uint16)
+    out = _prep_frame(frame)
+    assert out.dtype == np.uint8
+    assert out.shape == (50, 50)
+    assert np.all(out == 0x12) # High byte of 0x1234
+
+def test_prep_frame_uint16_odd_shape():
+    """
+    Test that _prep_frame handles odd frame dimensions without running
+    the kernel past the source bounds.
+    """
+    frame = np.arange(101 * 75, dtype=np.uint16).reshape(101, 75)
+    out = _prep_frame(frame)
+    assert out.shape == (50, 37)
+    # The kernel samples every other pixel and keeps the high byte
+    expected = (frame[::2, ::2][:50, :37] >> 8).astype(np.uint8)
+    np.testing.assert_array_equal(out, expected)
+
+def test_prep_frame_session_buffers_are_reused():
+    """
+    Test that passing the per-session buffer dict reuses the same output
+    array across frames of the same shape.
+    """
+    buffers = {}
+    frame = np.zeros((100, 100), dtype=np.uint16)
+    first = _prep_frame(frame, buffers)
+    second = _prep_frame(frame, buffers)
+    assert first is second
+    # Without the session dict each call must get a fresh array
+    assert _prep_frame(frame) is not _prep_frame(frame)
+
+def test_prep_frame_uint8_downsample():
+    """
+    Test the NumPy fallback path for uint8 frames: downsampled and
+    contiguous for the encoder.
+    """
+    frame = np.zeros((100, 100), dtype=np.uint8)
+    out = _prep_frame(frame)
+    assert out.dtype == np.uint8
+    assert out.shape == (50, 50)
+    assert out.flags['C_CONTIGUOUS']
+
+# Streaming tests
+
+@pytest.fixture
+def mock_streaming_camera():
+    """Fixture to mock a camera delivering frames for the stream endpoints."""
+    # Drop any client pooled by a previous test so this test's mock is
+    # the one the dependency connects to
+    reset_camera_pool()
+    with patch('fastlabio.camera.pysilico.camera') as mock_camera_constructor:
+        mock_camera_instance = MagicMock()
+
+        # Two distinct frames, then the second one repeated forever:
+        # distinct frames exercise the batch path, the repeats are
+        # deduplicated by the WebSocket stream and trigger the keepalive
+        frame_a = np.full((100, 100), 10, dtype=np.uint8)
+        frame_b = np.full((100, 100), 20, dtype=np.uint8)
+        pending = [[frame_a], [frame_b]]
+
+        def get_future_frames(num_frames):
+            if pending:
+                return pending.pop(0)
+            time.sleep(0.01) # Pace the producer once the distinct frames are out
+            return [frame_b]
+
+        mock_camera_instance.getFutureFrames.side_effect = get_future_frames
+
+        mock_camera_constructor.return_value = mock_camera_instance
+
+        yield mock_camera_instance
+
+async def _fake_encode(frame):
+    """Stand-in for the encoder pool: tag the payload with the pixel value."""
+    return b"jpeg-" + str(int(frame[0, 0])).encode()
+
+def test_websocket_stream_batch_framing_and_keepalive(mock_streaming_camera):
+    """
+    Test the WebSocket stream wire format: a MSG_FRAMES batch of
+    length-prefixed JPEG payloads, then a MSG_UNCHANGED keepalive once
+    the frames stop changing.
+    """
+    with patch.object(camera_module, '_encode_jpeg_in_pool', _fake_encode):
+        with client.websocket_connect("/camera/ws/camera/stream") as websocket:
+            payloads = []
+            keepalive_seen = False
+            while len(payloads) < 2 or not keepalive_seen:
+                message = bytes(websocket.receive_bytes())
+                if message == MSG_UNCHANGED:
+                    keepalive_seen = True
+                    continue
+                assert message[0:1] == MSG_FRAMES
+                # Parse the batch: repeated little-endian uint32 length
+                # prefix plus JPEG payload
+                offset = 1
+                while offset < len(message):
+                    (length,) = struct.unpack_from("<I", message, offset)
+                    payloads.append(message[offset + 4:offset + 4 + length])
+                    offset += 4 + length
+                assert offset == len(message) # No trailing garbage
+
+    # The two distinct frames arrive in order; the repeats are deduplicated
+    assert payloads[:2] == [b"jpeg-10", b"jpeg-20"]
+
+@pytest.fixture
+def mock_finite_streaming_camera():
+    """Fixture to mock a camera whose stream ends after a single frame."""
+    # Drop any client pooled by a previous test so this test's mock is
+    # the one the dependency connects to
+    reset_camera_pool()
+    with patch('fastlabio.camera.pysilico.camera') as mock_camera_constructor:
+        mock_camera_instance = MagicMock()
+
+        # One frame, then an acquisition error: the producer pushes the
+        # error into the queue as the failure sentinel, which ends the
+        # MJPEG generator. TestClient buffers the whole response body
+        # before returning, so the stream must be finite under test.
+        frame_a = np.full((100, 100), 10, dtype=np.uint8)
+        pending = [[frame_a]]
+
+        def get_future_frames(num_frames):
+            if pending:
+                return pending.pop(0)
+            raise RuntimeError("camera gone")
+
+        mock_camera_instance.getFutureFrames.side_effect = get_future_frames
+
+        mock_camera_constructor.return_value = mock_camera_instance
+
+        yield mock_camera_instance
+
+def test_mjpeg_stream_part_format(mock_finite_streaming_camera):
+    """
+    Test the MJPEG endpoint's multipart framing: boundary, content type
+    and a Content-Length matching the JPEG payload.
+    """
+    with patch.object(camera_module, '_encode_jpeg_in_pool', _fake_encode):
+        response = client.get("/camera/mjpeg")
+
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'multipart/x-mixed-replace; boundary=frame'
+    # The single streamed part, complete with boundary and headers
+    assert response.content == (b"--frame\r\nContent-Type: image/jpeg\r\n"
+                                b"Content-Length: 7\r\n\r\njpeg-10\r\n")
+
 # Add more test cases for endpoints below
 
 # Example test case for GET /camera/frame
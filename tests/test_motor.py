@@ -21,7 +21,7 @@ from unittest.mock import patch, MagicMock
 # from main import app
 # from ..main import app
 from fastlabio.fastlabio.main import app
-from fastlabio.fastlabio.motor import get_plico_motor, MotorMoveRequest, MotorSpeedRequest
+from fastlabio.fastlabio.motor import get_plico_motor, reset_motor_pool, MotorMoveRequest, MotorSpeedRequest
 
 # Create a TestClient for the FastAPI application
 client = TestClient(app)
@@ -32,6 +32,9 @@ client = TestClient(app)
 @pytest.fixture
 def mock_plico_motor_client():
     """Fixture to mock the plico_motor client dependency."""
+    # Drop any client pooled by a previous test so this test's mock is
+    # the one the dependency connects to
+    reset_motor_pool()
     # Patch the specific client class or function used in get_plico_motor
     # Adjust 'plico.motor.motor_client' based on the actual import/usage in fastlabio/motor.py
     with patch('plico_motor.motor') as mock_motor_constructor:
@@ -110,3 +113,38 @@ async def test_set_motor_speed_invalid_input():
 
     assert response.status_code == 422 # FastAPI returns 422 for validation errors
     assert "validation error" in response.json()["detail"][0]["msg"].lower() # Check for validation error message
+
+@pytest.mark.asyncio
+async def test_move_motor_trusted_skips_validation(mock_plico_motor_client):
+    """
+    Test that ?trusted=1 on PUT /motor/move bypasses validation and
+    still moves the motor.
+    """
+    response = client.put("/motor/move?trusted=1", json={"position": 12.5})
+
+    assert response.status_code == 200
+    assert response.json() == {"message": "Motor moving to position: 12.5"}
+    mock_plico_motor_client.move.assert_called_once_with(12.5)
+
+@pytest.mark.asyncio
+async def test_move_motor_malformed_json(mock_plico_motor_client):
+    """
+    Test that an unparseable body on PUT /motor/move yields a 422, not
+    a 500, now that the body is parsed with orjson by hand.
+    """
+    response = client.put("/motor/move", content=b"not json",
+                          headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 422
+    mock_plico_motor_client.move.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_move_motor_non_object_body(mock_plico_motor_client):
+    """
+    Test that a JSON body which is not an object on PUT /motor/move is
+    rejected with a 422 by model validation.
+    """
+    response = client.put("/motor/move", json=[1, 2])
+
+    assert response.status_code == 422
+    mock_plico_motor_client.move.assert_not_called()